@@ -1,5 +1,6 @@
 import errno
 import fnmatch
+import threading
 import json
 import os
 import os.path
@@ -10,8 +11,10 @@ import sys
 import tarfile
 import requests
 import stat
+from contextlib import contextmanager
 from typing import (
-    Type, NoReturn, List, Optional, Dict, Any, Tuple, Callable, Union
+    Type, NoReturn, List, Optional, Dict, Any, Tuple, Callable, Union,
+    Iterator,
 )
 
 import dbt.exceptions
@@ -26,6 +29,47 @@ else:
     c_bool = None
 
 
+# (file name, absolute path, path relative to the searched directory)
+WalkedFile = Tuple[str, str, str]
+
+_walk_state = threading.local()
+
+
+@contextmanager
+def cached_directory_walks() -> Iterator[None]:
+    """While this is active, find_matching walks each directory at most
+    once on the current thread, and later searches of the same directory
+    (for a different file pattern) are answered from memory.
+    """
+    previous = getattr(_walk_state, 'walks', None)
+    _walk_state.walks = {}
+    try:
+        yield
+    finally:
+        _walk_state.walks = previous
+
+
+def _walk_files(absolute_path_to_search: str) -> List[WalkedFile]:
+    walks: Optional[Dict[str, List[WalkedFile]]] = getattr(
+        _walk_state, 'walks', None
+    )
+    if walks is not None and absolute_path_to_search in walks:
+        return walks[absolute_path_to_search]
+
+    walked: List[WalkedFile] = []
+    for current_path, _, local_files in os.walk(absolute_path_to_search):
+        for local_file in local_files:
+            absolute_path = os.path.join(current_path, local_file)
+            relative_path = os.path.relpath(
+                absolute_path, absolute_path_to_search
+            )
+            walked.append((local_file, absolute_path, relative_path))
+
+    if walks is not None:
+        walks[absolute_path_to_search] = walked
+    return walked
+
+
 def find_matching(
     root_path: str,
     relative_paths_to_search: List[str],
@@ -53,20 +97,15 @@ def find_matching(
     for relative_path_to_search in relative_paths_to_search:
         absolute_path_to_search = os.path.join(
             root_path, relative_path_to_search)
-        walk_results = os.walk(absolute_path_to_search)
-
-        for current_path, subdirectories, local_files in walk_results:
-            for local_file in local_files:
-                absolute_path = os.path.join(current_path, local_file)
-                relative_path = os.path.relpath(
-                    absolute_path, absolute_path_to_search
-                )
-                if reobj.match(local_file):
-                    matching.append({
-                        'searched_path': relative_path_to_search,
-                        'absolute_path': absolute_path,
-                        'relative_path': relative_path,
-                    })
+        walked = _walk_files(absolute_path_to_search)
+
+        for local_file, absolute_path, relative_path in walked:
+            if reobj.match(local_file):
+                matching.append({
+                    'searched_path': relative_path_to_search,
+                    'absolute_path': absolute_path,
+                    'relative_path': relative_path,
+                })
 
     return matching
 
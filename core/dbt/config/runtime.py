@@ -297,10 +297,10 @@ class RuntimeConfig(Project, Profile, AdapterRequiredConfig):
         unused_resource_config_paths = []
         for resource_type, config_paths in resource_config_paths.items():
             used_fqns = resource_fqns.get(resource_type, frozenset())
-            fqns = used_fqns | disabled_fqns
+            used_paths = _fqn_prefixes(used_fqns | disabled_fqns)
 
             for config_path in config_paths:
-                if not _is_config_used(config_path, fqns):
+                if config_path not in used_paths:
                     unused_resource_config_paths.append(
                         (resource_type,) + config_path
                     )
@@ -557,9 +557,10 @@ There are {} unused configuration paths:
 """
 
 
-def _is_config_used(path, fqns):
-    if fqns:
-        for fqn in fqns:
-            if len(path) <= len(fqn) and fqn[:len(path)] == path:
-                return True
-    return False
+def _fqn_prefixes(fqns: Iterable[FQNPath]) -> PathSet:
+    """Return every prefix of every fqn, including the fqns themselves. A
+    config path is used if and only if it is in this set.
+    """
+    return frozenset(
+        fqn[:index] for fqn in fqns for index in range(len(fqn) + 1)
+    )
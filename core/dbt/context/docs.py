@@ -9,7 +9,7 @@ from dbt.exceptions import (
 from dbt.config.runtime import RuntimeConfig
 from dbt.contracts.graph.compiled import CompileResultNode
 from dbt.contracts.graph.manifest import Manifest
-from dbt.contracts.graph.parsed import ParsedMacro
+from dbt.contracts.graph.parsed import ParsedMacro, ParsedExposure
 
 from dbt.context.base import contextmember
 from dbt.context.configured import SchemaYamlContext
@@ -19,11 +19,13 @@ class DocsRuntimeContext(SchemaYamlContext):
     def __init__(
         self,
         config: RuntimeConfig,
-        node: Union[ParsedMacro, CompileResultNode],
+        node: Union[ParsedMacro, CompileResultNode, ParsedExposure],
         manifest: Manifest,
         current_project: str,
     ) -> None:
         super().__init__(config, current_project)
+        # nothing but doc() looks at the node, and only when it's called, so
+        # a single context can be reused for many nodes by setting this.
         self.node = node
         self.manifest = manifest
 
@@ -388,6 +388,30 @@ class NameSearcher(Generic[N]):
         return None
 
 
+class DisabledLookup:
+    """Disabled nodes grouped by search name, so finding one doesn't mean
+    scanning every disabled node in the manifest. Within a name, the nodes
+    keep their order in manifest.disabled, so the first match is the same
+    one a full scan would find.
+    """
+    def __init__(self, manifest: 'Manifest'):
+        self.storage: Dict[str, List[CompileResultNode]] = {}
+        self._manifest = manifest
+        self.populate()
+
+    def populate(self):
+        for node in self._manifest.disabled:
+            self.storage.setdefault(node.search_name, []).append(node)
+
+    def find(
+        self, name: str, package: Optional[str], nodetypes: List[NodeType]
+    ) -> Optional[CompileResultNode]:
+        if name not in self.storage:
+            return None
+        searcher: NameSearcher = NameSearcher(name, package, nodetypes)
+        return searcher.search(self.storage[name])
+
+
 D = TypeVar('D')
 
 
@@ -545,6 +569,11 @@ class Manifest(MacroMethods):
     _docs_cache: Optional[DocCache] = None
     _sources_cache: Optional[SourceCache] = None
     _refs_cache: Optional[RefableCache] = None
+    _disabled_cache: Optional[DisabledLookup] = None
+    # (project name, materialization name, adapter type) -> macro
+    _materialization_cache: MutableMapping[
+        Tuple[str, str, str], Optional[ParsedMacro]
+    ] = field(default_factory=dict)
     _lock: Lock = field(default_factory=flags.MP_CONTEXT.Lock)
 
     def sync_update_node(
@@ -596,20 +625,18 @@ class Manifest(MacroMethods):
     def find_disabled_by_name(
         self, name: str, package: Optional[str] = None
     ) -> Optional[ManifestNode]:
-        searcher: NameSearcher = NameSearcher(
-            name, package, NodeType.refable()
-        )
-        result = searcher.search(self.disabled)
+        result = self.disabled_cache.find(name, package, NodeType.refable())
+        # appease mypy - sources aren't refable!
+        assert not isinstance(result, ParsedSourceDefinition)
         return result
 
     def find_disabled_source_by_name(
         self, source_name: str, table_name: str, package: Optional[str] = None
     ) -> Optional[ParsedSourceDefinition]:
         search_name = f'{source_name}.{table_name}'
-        searcher: NameSearcher = NameSearcher(
+        result = self.disabled_cache.find(
             search_name, package, [NodeType.Source]
         )
-        result = searcher.search(self.disabled)
         if result is not None:
             assert isinstance(result, ParsedSourceDefinition)
         return result
@@ -638,6 +665,12 @@ class Manifest(MacroMethods):
     def find_materialization_macro_by_name(
         self, project_name: str, materialization_name: str, adapter_type: str
     ) -> Optional[ParsedMacro]:
+        # every node being run looks this up, and finding the candidates
+        # means searching all the macros, so remember the answer
+        key = (project_name, materialization_name, adapter_type)
+        if key in self._materialization_cache:
+            return self._materialization_cache[key]
+
         candidates: CandidateList = CandidateList(chain.from_iterable(
             self._materialization_candidates_for(
                 project_name=project_name,
@@ -645,7 +678,9 @@ class Manifest(MacroMethods):
                 adapter_type=atype,
             ) for atype in (adapter_type, None)
         ))
-        return candidates.last()
+        macro = candidates.last()
+        self._materialization_cache[key] = macro
+        return macro
 
     def get_resource_fqns(self) -> Mapping[str, PathSet]:
         resource_fqns: Dict[str, Set[Tuple[str, ...]]] = {}
@@ -847,6 +882,14 @@ class Manifest(MacroMethods):
         self._refs_cache = cache
         return cache
 
+    @property
+    def disabled_cache(self) -> DisabledLookup:
+        if self._disabled_cache is not None:
+            return self._disabled_cache
+        cache = DisabledLookup(self)
+        self._disabled_cache = cache
+        return cache
+
     def resolve_ref(
         self,
         target_model_name: str,
@@ -1190,6 +1233,8 @@ class Manifest(MacroMethods):
             self._docs_cache,
             self._sources_cache,
             self._refs_cache,
+            self._disabled_cache,
+            self._materialization_cache,
         )
         return self.__class__, args
 
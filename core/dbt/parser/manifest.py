@@ -1,9 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from dataclasses import field
+from itertools import chain
 import os
 import pickle
 from typing import (
-    Dict, Optional, Mapping, Callable, Any, List, Type, Union
+    Dict, Optional, Mapping, Callable, Any, List, Type, Union, Tuple,
+    Iterable, Iterator,
 )
 import time
 
@@ -19,9 +23,9 @@ from dbt.helper_types import PathSet
 from dbt.logger import GLOBAL_LOGGER as logger, DbtProcessState
 from dbt.node_types import NodeType
 from dbt.clients.jinja import get_rendered
-from dbt.clients.system import make_directory
+from dbt.clients.system import make_directory, cached_directory_walks
 from dbt.config import Project, RuntimeConfig
-from dbt.context.docs import generate_runtime_docs
+from dbt.context.docs import DocsRuntimeContext, generate_runtime_docs
 from dbt.contracts.files import FilePath, FileHash
 from dbt.contracts.graph.compiled import ManifestNode
 from dbt.contracts.graph.manifest import (
@@ -58,6 +62,9 @@ from dbt.dataclass_schema import dbtClassMixin
 PARTIAL_PARSE_FILE_NAME = 'partial_parse.pickle'
 PARSING_STATE = DbtProcessState('parsing')
 DEFAULT_PARTIAL_PARSE = False
+# below this many files, the thread pool costs more than it saves
+PARALLEL_LOAD_THRESHOLD = 16
+MAX_LOAD_WORKERS = min(32, (os.cpu_count() or 1) + 4)
 
 
 @dataclass
@@ -86,6 +93,23 @@ class ManifestLoaderInfo(dbtClassMixin, Writable):
     projects: List[ProjectLoaderInfo] = field(default_factory=list)
 
 
+@contextmanager
+def _timed(info: Union[ParserInfo, ProjectLoaderInfo]) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        info.elapsed += time.perf_counter() - start
+
+
+# Written ahead of the manifest in the partial parse file, so a stale cache
+# can be rejected without unpickling the whole manifest.
+@dataclass
+class PartialParseHeader:
+    dbt_version: str
+    state_check: Optional[ManifestStateCheck]
+
+
 _parser_types: List[Type[Parser]] = [
     ModelParser,
     SnapshotParser,
@@ -116,8 +140,9 @@ class ManifestLoader:
             self.macro_hook = macro_hook
 
         self._loaded_file_cache: Dict[str, FileBlock] = {}
+        self._partial_parse: bool = self._partial_parse_enabled()
         self._perf_info = ManifestLoaderInfo(
-            is_partial_parse_enabled=self._partial_parse_enabled()
+            is_partial_parse_enabled=self._partial_parse
         )
         # Creating state_check must go before read_saved_manifest
         self.manifest.state_check = self.build_manifest_state_check()
@@ -178,13 +203,45 @@ class ManifestLoader:
         return False
 
     def _get_file(self, path: FilePath, parser: BaseParser) -> FileBlock:
-        if path.search_key in self._loaded_file_cache:
-            block = self._loaded_file_cache[path.search_key]
+        # search_key normalizes the path on every access, so only do it once
+        key = path.search_key
+        if key in self._loaded_file_cache:
+            block = self._loaded_file_cache[key]
         else:
             block = FileBlock(file=parser.load_file(path))
-            self._loaded_file_cache[path.search_key] = block
+            self._loaded_file_cache[key] = block
         return block
 
+    # Reading and hashing files is I/O bound and doesn't touch the
+    # manifest, so load everything the parsers found up front, in a
+    # thread pool. The parsing itself stays serial because parsers
+    # write directly into self.manifest.
+    def _load_files(
+        self, parser_paths: Iterable[Tuple[BaseParser, List[FilePath]]]
+    ) -> None:
+        to_load: Dict[str, Tuple[BaseParser, FilePath]] = {}
+        for parser, paths in parser_paths:
+            for path in paths:
+                key = path.search_key
+                if key not in self._loaded_file_cache and key not in to_load:
+                    to_load[key] = (parser, path)
+
+        if len(to_load) < PARALLEL_LOAD_THRESHOLD:
+            for parser, path in to_load.values():
+                self._get_file(path, parser)
+            return
+
+        def load(item: Tuple[BaseParser, FilePath]) -> FileBlock:
+            parser, path = item
+            return FileBlock(file=parser.load_file(path))
+
+        with ThreadPoolExecutor(max_workers=MAX_LOAD_WORKERS) as executor:
+            # map() yields in submission order, so an error loading a file
+            # surfaces the same way it would have when loading serially
+            blocks = executor.map(load, to_load.values())
+            for key, block in zip(to_load, blocks):
+                self._loaded_file_cache[key] = block
+
     def parse_project(
         self,
         project: Project,
@@ -197,35 +254,36 @@ class ManifestLoader:
         # per-project cache.
         self._loaded_file_cache.clear()
 
-        project_parser_info: List[ParserInfo] = []
-        start_timer = time.perf_counter()
-        total_path_count = 0
-        for parser in parsers:
-            parser_path_count = 0
-            parser_start_timer = time.perf_counter()
-            for path in parser.search():
-                self.parse_with_cache(path, parser)
-                parser_path_count = parser_path_count + 1
-
-            if parser_path_count > 0:
-                project_parser_info.append(ParserInfo(
-                    parser=parser.resource_type,
-                    path_count=parser_path_count,
-                    elapsed=time.perf_counter() - parser_start_timer
-                ))
-                total_path_count = total_path_count + parser_path_count
-
-        elapsed = time.perf_counter() - start_timer
         project_info = ProjectLoaderInfo(
             project_name=project.project_name,
-            path_count=total_path_count,
-            elapsed=elapsed,
-            parsers=project_parser_info
+            elapsed=0.0,
+            parsers=[],
         )
+        with _timed(project_info):
+            # several parsers search the same directories for different
+            # extensions, so only walk each of them once
+            with cached_directory_walks():
+                parser_paths = [
+                    (parser, parser.search()) for parser in parsers
+                ]
+            self._load_files(parser_paths)
+            for parser, paths in parser_paths:
+                # parsers that found nothing are left out of the perf info
+                if not paths:
+                    continue
+                parser_info = ParserInfo(
+                    parser=parser.resource_type,
+                    elapsed=0.0,
+                    path_count=len(paths),
+                )
+                with _timed(parser_info):
+                    for path in paths:
+                        self.parse_with_cache(path, parser)
+                project_info.parsers.append(parser_info)
+                project_info.path_count += parser_info.path_count
+
         self._perf_info.projects.append(project_info)
-        self._perf_info.path_count = (
-            self._perf_info.path_count + total_path_count
-        )
+        self._perf_info.path_count += project_info.path_count
 
     # This is where the main action happens
     def load(self):
@@ -242,43 +300,80 @@ class ManifestLoader:
             time.perf_counter() - start_timer
         )
 
+    def _unchanged_since_saved(self) -> bool:
+        """If the same files produced results as last time, with the same
+        checksums, the saved partial parse file is still accurate. Files that
+        produce nothing (like a dbt_project.yml without hooks) are never
+        recorded, so they don't count as changes.
+        """
+        if self.old_manifest is None:
+            return False
+        old_files = self.old_manifest.files
+        if self.manifest.files.keys() != old_files.keys():
+            return False
+        return all(
+            source_file.checksum == old_files[key].checksum
+            for key, source_file in self.manifest.files.items()
+        )
+
     def write_manifest_for_partial_parse(self):
+        if self._unchanged_since_saved():
+            logger.debug('Parse results unchanged, partial parse file not updated')
+            return
         path = os.path.join(self.root_project.target_path,
                             PARTIAL_PARSE_FILE_NAME)
         make_directory(self.root_project.target_path)
+        header = PartialParseHeader(
+            dbt_version=self.manifest.metadata.dbt_version,
+            state_check=self.manifest.state_check,
+        )
         with open(path, 'wb') as fp:
-            pickle.dump(self.manifest, fp)
+            pickle.dump(header, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(self.manifest, fp, protocol=pickle.HIGHEST_PROTOCOL)
 
     def matching_parse_results(self, manifest: Manifest) -> bool:
         """Compare the global hashes of the read-in parse results' values to
         the known ones, and return if it is ok to re-use the results.
         """
         try:
-            if manifest.metadata.dbt_version != __version__:
-                logger.debug(
-                    'dbt version mismatch: {} != {}, cache invalidated'
-                    .format(manifest.metadata.dbt_version, __version__)
-                )
-                return False
+            dbt_version = manifest.metadata.dbt_version
         except AttributeError as exc:
             logger.debug(f"malformed result file, cache invalidated: {exc}")
             return False
+        return self._matching_state(dbt_version, manifest.state_check)
 
-        valid = True
+    def _matching_state(
+        self,
+        dbt_version: str,
+        state_check: Optional[ManifestStateCheck],
+    ) -> bool:
+        if dbt_version != __version__:
+            logger.debug(
+                'dbt version mismatch: {} != {}, cache invalidated'
+                .format(dbt_version, __version__)
+            )
+            return False
 
-        if not self.manifest.state_check or not manifest.state_check:
+        if not self.manifest.state_check or not state_check:
             return False
 
-        if self.manifest.state_check.vars_hash != manifest.state_check.vars_hash:
+        # the common case: compare everything at once, and only go looking
+        # for what differs if something does
+        if self.manifest.state_check == state_check:
+            return True
+
+        valid = True
+
+        if self.manifest.state_check.vars_hash != state_check.vars_hash:
             logger.debug('vars hash mismatch, cache invalidated')
             valid = False
-        if self.manifest.state_check.profile_hash != manifest.state_check.profile_hash:
+        if self.manifest.state_check.profile_hash != state_check.profile_hash:
             logger.debug('profile hash mismatch, cache invalidated')
             valid = False
 
         missing_keys = {
             k for k in self.manifest.state_check.project_hashes
-            if k not in manifest.state_check.project_hashes
+            if k not in state_check.project_hashes
         }
         if missing_keys:
             logger.debug(
@@ -288,8 +383,8 @@ class ManifestLoader:
             valid = False
 
         for key, new_value in self.manifest.state_check.project_hashes.items():
-            if key in manifest.state_check.project_hashes:
-                old_value = manifest.state_check.project_hashes[key]
+            if key in state_check.project_hashes:
+                old_value = state_check.project_hashes[key]
                 if new_value != old_value:
                     logger.debug(
                         'For key {}, hash mismatch ({} -> {}), cache '
@@ -310,7 +405,7 @@ class ManifestLoader:
             return DEFAULT_PARTIAL_PARSE
 
     def read_saved_manifest(self) -> Optional[Manifest]:
-        if not self._partial_parse_enabled():
+        if not self._partial_parse:
             logger.debug('Partial parsing not enabled')
             return None
         path = os.path.join(self.root_project.target_path,
@@ -319,11 +414,22 @@ class ManifestLoader:
         if os.path.exists(path):
             try:
                 with open(path, 'rb') as fp:
+                    header = pickle.load(fp)
+                    if not isinstance(header, PartialParseHeader):
+                        logger.debug(
+                            'partial parse file is in an old format, cache '
+                            'invalidated'
+                        )
+                        return None
+                    # keep this check inside the try/except in case something
+                    # about the file has changed in weird ways, perhaps due to
+                    # being a different version of dbt
+                    if not self._matching_state(
+                        header.dbt_version, header.state_check
+                    ):
+                        return None
+                    # only now is it worth reading the manifest itself
                     manifest: Manifest = pickle.load(fp)
-                # keep this check inside the try/except in case something about
-                # the file has changed in weird ways, perhaps due to being a
-                # different version of dbt
-                if self.matching_parse_results(manifest):
                     return manifest
             except Exception as exc:
                 logger.debug(
@@ -352,10 +458,9 @@ class ManifestLoader:
         # which is now named '_disabled'. This used to copy from
         # ParseResults to the Manifest. Can this be normalized so
         # there's only one disabled?
-        disabled = []
-        for value in self.manifest._disabled.values():
-            disabled.extend(value)
-        self.manifest.disabled = disabled
+        self.manifest.disabled = list(
+            chain.from_iterable(self.manifest._disabled.values())
+        )
         self._perf_info.patch_sources_elapsed = (
             time.perf_counter() - start_patch
         )
@@ -399,11 +504,23 @@ class ManifestLoader:
         with open(profile_path) as fp:
             profile_hash = FileHash.from_contents(fp.read())
 
-        project_hashes = {}
-        for name, project in all_projects.items():
+        def hash_project(project: Project) -> FileHash:
             path = os.path.join(project.project_root, 'dbt_project.yml')
             with open(path) as fp:
-                project_hashes[name] = FileHash.from_contents(fp.read())
+                return FileHash.from_contents(fp.read())
+
+        # one read per installed package, so overlap them when there are
+        # enough packages for that to pay off
+        project_hashes = {}
+        if len(all_projects) < PARALLEL_LOAD_THRESHOLD:
+            for name, project in all_projects.items():
+                project_hashes[name] = hash_project(project)
+        else:
+            workers = min(MAX_LOAD_WORKERS, len(all_projects))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                hashes = executor.map(hash_project, all_projects.values())
+                for name, project_hash in zip(all_projects, hashes):
+                    project_hashes[name] = project_hash
 
         state_check = ManifestStateCheck(
             vars_hash=vars_hash,
@@ -475,10 +592,16 @@ class ManifestLoader:
     # This creates a MacroManifest with 'files' and 'macros' to
     # save in the adapter
     def create_macro_manifest(self):
+        parser_paths = []
         for project in self.all_projects.values():
             # what is the manifest passed in actually used for?
             parser = MacroParser(project, self.manifest)
-            for path in parser.search():
+            parser_paths.append((parser, parser.search()))
+        # load the macro files of every project at once, then parse them in
+        # project order
+        self._load_files(parser_paths)
+        for parser, paths in parser_paths:
+            for path in paths:
                 self.parse_with_cache(path, parser)
         macro_manifest = MacroManifest(self.manifest.macros, self.manifest.files)
         return macro_manifest
@@ -559,33 +682,32 @@ def _check_resource_uniqueness(
     names_resources: Dict[str, ManifestNode] = {}
     alias_resources: Dict[str, ManifestNode] = {}
 
+    refable = set(NodeType.refable())
+    # the full node name is really defined by the adapter's relation
+    relation_cls = get_relation_class_by_name(config.credentials.type)
+
     for resource, node in manifest.nodes.items():
-        if node.resource_type not in NodeType.refable():
+        if node.resource_type not in refable:
             continue
         # appease mypy - sources aren't refable!
         assert not isinstance(node, ParsedSourceDefinition)
 
         name = node.name
-        # the full node name is really defined by the adapter's relation
-        relation_cls = get_relation_class_by_name(config.credentials.type)
         relation = relation_cls.create_from(config=config, node=node)
         full_node_name = str(relation)
 
-        existing_node = names_resources.get(name)
-        if existing_node is not None:
+        existing_node = names_resources.setdefault(name, node)
+        if existing_node is not node:
             dbt.exceptions.raise_duplicate_resource_name(
                 existing_node, node
             )
 
-        existing_alias = alias_resources.get(full_node_name)
-        if existing_alias is not None:
+        existing_alias = alias_resources.setdefault(full_node_name, node)
+        if existing_alias is not node:
             dbt.exceptions.raise_ambiguous_alias(
                 existing_alias, node, full_node_name
             )
 
-        names_resources[name] = node
-        alias_resources[full_node_name] = node
-
 
 def _warn_for_unused_resource_config_paths(
     manifest: Manifest, config: RuntimeConfig
@@ -683,37 +805,33 @@ def _process_docs_for_exposure(
 # macros: macro argument descriptions
 # exposures: exposure descriptions
 def process_docs(manifest: Manifest, config: RuntimeConfig):
+    # Building the docs context is far more expensive than rendering most
+    # descriptions, and only doc() depends on the node. So build it once
+    # and point it at each node in turn, starting from the first one.
+    first = next(chain(
+        manifest.nodes.values(),
+        manifest.sources.values(),
+        manifest.macros.values(),
+        manifest.exposures.values(),
+    ), None)
+    if first is None:
+        return
+    docs_context = DocsRuntimeContext(
+        config, first, manifest, config.project_name
+    )
+    # This is not a Mashumaro to_dict call
+    ctx = docs_context.to_dict()
     for node in manifest.nodes.values():
-        ctx = generate_runtime_docs(
-            config,
-            node,
-            manifest,
-            config.project_name,
-        )
+        docs_context.node = node
         _process_docs_for_node(ctx, node)
     for source in manifest.sources.values():
-        ctx = generate_runtime_docs(
-            config,
-            source,
-            manifest,
-            config.project_name,
-        )
+        docs_context.node = source
         _process_docs_for_source(ctx, source)
     for macro in manifest.macros.values():
-        ctx = generate_runtime_docs(
-            config,
-            macro,
-            manifest,
-            config.project_name,
-        )
+        docs_context.node = macro
         _process_docs_for_macro(ctx, macro)
     for exposure in manifest.exposures.values():
-        ctx = generate_runtime_docs(
-            config,
-            exposure,
-            manifest,
-            config.project_name,
-        )
+        docs_context.node = exposure
         _process_docs_for_exposure(ctx, exposure)
 
 
@@ -721,6 +839,7 @@ def _process_refs_for_exposure(
     manifest: Manifest, current_project: str, exposure: ParsedExposure
 ):
     """Given a manifest and a exposure in that manifest, process its refs"""
+    updated = False
     for ref in exposure.refs:
         target_model: Optional[Union[Disabled, ManifestNode]] = None
         target_model_name: str
@@ -755,6 +874,9 @@ def _process_refs_for_exposure(
         target_model_id = target_model.unique_id
 
         exposure.depends_on.nodes.append(target_model_id)
+        updated = True
+
+    if updated:
         manifest.update_exposure(exposure)
 
 
@@ -762,6 +884,7 @@ def _process_refs_for_node(
     manifest: Manifest, current_project: str, node: ManifestNode
 ):
     """Given a manifest and a node in that manifest, process its refs"""
+    updated = False
     for ref in node.refs:
         target_model: Optional[Union[Disabled, ManifestNode]] = None
         target_model_name: str
@@ -797,10 +920,13 @@ def _process_refs_for_node(
         target_model_id = target_model.unique_id
 
         node.depends_on.nodes.append(target_model_id)
-        # TODO: I think this is extraneous, node should already be the same
-        # as manifest.nodes[node.unique_id] (we're mutating node here, not
-        # making a new one)
-        # Q: could we stop doing this?
+        updated = True
+
+    # TODO: I think this is extraneous, node should already be the same
+    # as manifest.nodes[node.unique_id] (we're mutating node here, not
+    # making a new one)
+    # Q: could we stop doing this?
+    if updated:
         manifest.update_node(node)
 
 
@@ -818,6 +944,10 @@ def _process_sources_for_exposure(
     manifest: Manifest, current_project: str, exposure: ParsedExposure
 ):
     target_source: Optional[Union[Disabled, ParsedSourceDefinition]] = None
+    updated = False
+    dependencies = exposure.depends_on.nodes
+    # a source can be selected from more than once, but is one dependency
+    seen = set(dependencies)
     for source_name, table_name in exposure.sources:
         target_source = manifest.resolve_source(
             source_name,
@@ -834,7 +964,13 @@ def _process_sources_for_exposure(
             )
             continue
         target_source_id = target_source.unique_id
-        exposure.depends_on.nodes.append(target_source_id)
+        if target_source_id in seen:
+            continue
+        seen.add(target_source_id)
+        dependencies.append(target_source_id)
+        updated = True
+
+    if updated:
         manifest.update_exposure(exposure)
 
 
@@ -842,6 +978,10 @@ def _process_sources_for_node(
     manifest: Manifest, current_project: str, node: ManifestNode
 ):
     target_source: Optional[Union[Disabled, ParsedSourceDefinition]] = None
+    updated = False
+    dependencies = node.depends_on.nodes
+    # a source can be selected from more than once, but is one dependency
+    seen = set(dependencies)
     for source_name, table_name in node.sources:
         target_source = manifest.resolve_source(
             source_name,
@@ -861,7 +1001,13 @@ def _process_sources_for_node(
             )
             continue
         target_source_id = target_source.unique_id
-        node.depends_on.nodes.append(target_source_id)
+        if target_source_id in seen:
+            continue
+        seen.add(target_source_id)
+        dependencies.append(target_source_id)
+        updated = True
+
+    if updated:
         manifest.update_node(node)
 
 
@@ -869,12 +1015,15 @@ def _process_sources_for_node(
 # 'sources' array finds the source node and updates the
 # 'depends_on.nodes' array with the unique id
 def process_sources(manifest: Manifest, current_project: str):
+    # sources are only ever in manifest.sources, never in manifest.nodes
     for node in manifest.nodes.values():
-        if node.resource_type == NodeType.Source:
+        # most nodes don't select from any sources
+        if not node.sources:
             continue
-        assert not isinstance(node, ParsedSourceDefinition)
         _process_sources_for_node(manifest, current_project, node)
     for exposure in manifest.exposures.values():
+        if not exposure.sources:
+            continue
         _process_sources_for_exposure(manifest, current_project, exposure)
     return manifest
 
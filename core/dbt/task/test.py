@@ -1,5 +1,5 @@
 import threading
-from typing import Dict, Any, Set
+from typing import Dict, Any, Set, FrozenSet
 
 from .compile import CompileRunner
 from .run import RunTask
@@ -158,16 +158,16 @@ class TestSelector(ResourceTypeSelector):
             previous_state=previous_state,
             resource_types=[NodeType.Test],
         )
+        self._test_ids: FrozenSet[UniqueId] = frozenset(
+            unique_id for unique_id, node in manifest.nodes.items()
+            if node.resource_type == NodeType.Test
+        )
 
     def expand_selection(self, selected: Set[UniqueId]) -> Set[UniqueId]:
+        if not selected:
+            return selected
         # exposures can't have tests, so this is relatively easy
-        selected_tests = set()
-        for unique_id in self.graph.select_successors(selected):
-            if unique_id in self.manifest.nodes:
-                node = self.manifest.nodes[unique_id]
-                if node.resource_type == NodeType.Test:
-                    selected_tests.add(unique_id)
-
+        selected_tests = self._test_ids & self.graph.select_successors(selected)
         return selected | selected_tests
 
 
@@ -1,7 +1,14 @@
+import json
 import os
 import unittest
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Tuple
 from unittest.mock import MagicMock, patch
 
+import networkx
+
 from dbt.adapters.postgres import Plugin as PostgresPlugin
 from dbt.adapters.factory import reset_adapters
 import dbt.clients.system
@@ -15,7 +22,8 @@ import dbt.parser.manifest
 from dbt.contracts.files import SourceFile, FileHash, FilePath
 from dbt.contracts.graph.manifest import Manifest, MacroManifest, ManifestStateCheck
 from dbt.parser.base import BaseParser
-from dbt.graph import NodeSelector, parse_difference
+from dbt.graph import Graph, NodeSelector, parse_difference
+from dbt.node_types import NodeType
 
 try:
     from queue import Empty
@@ -27,25 +35,49 @@ from dbt.logger import GLOBAL_LOGGER as logger # noqa
 from .utils import config_from_parts_or_dicts, generate_name_macros, inject_plugin
 
 
-class GraphTest(unittest.TestCase):
+@dataclass(frozen=True)
+class ConfigStub:
+    enabled: bool = True
 
-    def tearDown(self):
-        self.write_gpickle_patcher.stop()
-        self.load_projects_patcher.stop()
-        self.file_system_patcher.stop()
-        self.get_adapter_patcher.stop()
-        self.get_adapter_patcher_parser.stop()
-        self.mock_filesystem_constructor.stop()
-        self.mock_hook_constructor.stop()
-        self.load_state_check.stop()
-        self.load_source_file_patcher.stop()
-        reset_adapters()
 
-    def setUp(self):
-        # create various attributes
-        dbt.flags.STRICT_MODE = True
-        self.graph_result = None
-        self.profile = {
+@dataclass(frozen=True)
+class NodeStub:
+    """Just the parts of a model that NodeSelector and GraphQueue use."""
+    unique_id: str
+    name: str
+    package_name: str
+    fqn: Tuple[str, ...]
+    empty: bool = False
+    is_ephemeral: bool = False
+    resource_type: NodeType = NodeType.Model
+    config: ConfigStub = field(default_factory=ConfigStub)
+
+
+class FakeSearcher:
+    """Stands in for a FilesystemSearcher, finding the given paths."""
+    __slots__ = ('project', 'relative_dirs', 'extension', '_paths')
+
+    def __init__(self, project, relative_dirs, extension, paths):
+        self.project = project
+        self.relative_dirs = relative_dirs
+        self.extension = extension
+        self._paths = paths
+
+    def __iter__(self):
+        return iter(self._paths)
+
+
+class GraphTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # The patches are the same for every test, so start them once for the
+        # whole class. Their side effects read per-test state (mock_models,
+        # graph_result) from the class, and setUp resets that state.
+        cls.mock_models = {}  # source files by path search key
+        cls.mock_model_paths = []  # used by filesystem_searcher
+        cls.graph_result = None
+        cls.profile = {
             'outputs': {
                 'test': {
                     'type': 'postgres',
@@ -60,83 +92,116 @@ class GraphTest(unittest.TestCase):
             },
             'target': 'test'
         }
-        self.macro_manifest = MacroManifest(
+        # parsing these projects never adds or patches macros, so every test
+        # can share the same ones
+        cls.macro_manifest = MacroManifest(
             {n.unique_id: n for n in generate_name_macros('test_models_compile')}, {})
-        self.mock_models = []  # used by filesystem_searcher
-
-        # Create gpickle patcher
-        self.write_gpickle_patcher = patch('networkx.write_gpickle')
-        def mock_write_gpickle(graph, outfile):
-            self.graph_result = graph
-        self.mock_write_gpickle = self.write_gpickle_patcher.start()
-        self.mock_write_gpickle.side_effect = mock_write_gpickle
-
-        # Create file system patcher and filesystem searcher
-        self.file_system_patcher = patch.object(
-            dbt.parser.search.FilesystemSearcher, '__new__'
-        )
-        self.mock_filesystem_constructor = self.file_system_patcher.start()
-        def filesystem_iter(iter_self):
-            if 'sql' not in iter_self.extension:
-                return []
-            if 'models' not in iter_self.relative_dirs:
-                return []
-            return [model.path for model in self.mock_models]
-        def create_filesystem_searcher(cls, project, relative_dirs, extension):
-            result = MagicMock(project=project, relative_dirs=relative_dirs, extension=extension)
-            result.__iter__.side_effect = lambda: iter(filesystem_iter(result))
-            return result
-        self.mock_filesystem_constructor.side_effect = create_filesystem_searcher
-
-        # Create HookParser patcher
-        self.hook_patcher = patch.object(
-            dbt.parser.hooks.HookParser, '__new__'
-        )
-        def create_hook_patcher(cls, project, manifest, root_project):
-            result = MagicMock(project=project, manifest=manifest, root_project=root_project)
-            result.__iter__.side_effect = lambda: iter([])
-            return result
-        self.mock_hook_constructor = self.hook_patcher.start()
-        self.mock_hook_constructor.side_effect = create_hook_patcher
-
-        # Create get_adapter patcher
-        self.get_adapter_patcher = patch('dbt.context.providers.get_adapter')
-        self.factory = self.get_adapter_patcher.start()
-        # Also patch the base class
-        self.get_adapter_patcher_parser = patch('dbt.parser.base.get_adapter')
-        self.factory_cmn = self.get_adapter_patcher_parser.start()
-        inject_plugin(PostgresPlugin)
+        # RuntimeConfigs by their extra project config; tests must not
+        # modify the configs they get
+        cls._configs = {}
+        # if any patch fails to start, the ones already started are stopped
+        with ExitStack() as patches:
+            # Create graph file patcher. Patching the compiler rather than
+            # networkx.write_gpickle also skips serializing every node into
+            # the graph that would be written.
+            def mock_write_graph_file(linker, manifest):
+                cls.graph_result = linker.graph
+            cls.mock_write_graph_file = patches.enter_context(
+                patch.object(dbt.compilation.Compiler, 'write_graph_file')
+            )
+            cls.mock_write_graph_file.side_effect = mock_write_graph_file
+
+            # Create file system patcher and filesystem searcher
+            def create_filesystem_searcher(searcher_cls, project, relative_dirs, extension):
+                if 'sql' in extension and 'models' in relative_dirs:
+                    paths = cls.mock_model_paths
+                else:
+                    paths = []
+                return FakeSearcher(project, relative_dirs, extension, paths)
+            cls.mock_filesystem_constructor = patches.enter_context(
+                patch.object(dbt.parser.search.FilesystemSearcher, '__new__')
+            )
+            cls.mock_filesystem_constructor.side_effect = create_filesystem_searcher
+
+            # Create HookParser patcher
+            def create_hook_patcher(parser_cls, project, manifest, root_project):
+                result = MagicMock(project=project, manifest=manifest, root_project=root_project)
+                result.__iter__.side_effect = lambda: iter([])
+                return result
+            cls.mock_hook_constructor = patches.enter_context(
+                patch.object(dbt.parser.hooks.HookParser, '__new__')
+            )
+            cls.mock_hook_constructor.side_effect = create_hook_patcher
 
-        # Create load_projects patcher
-        self.load_projects_patcher = patch('dbt.parser.manifest._load_projects')
-        self.mock_load_projects = self.load_projects_patcher.start()
-        def _load_projects(config, paths):
-            yield config.project_name, config
-        self.mock_load_projects.side_effect = _load_projects
-
-        # Create the Manifest.state_check patcher
-        @patch('dbt.parser.manifest.ManifestLoader.build_manifest_state_check')
-        def _mock_state_check(self):
-            config = self.root_project
-            all_projects = self.all_projects
-            return ManifestStateCheck(
-                vars_hash=FileHash.from_contents('vars'),
-                project_hashes={name: FileHash.from_contents(name) for name in all_projects},
-                profile_hash=FileHash.from_contents('profile'),
+            # Create get_adapter patcher
+            cls.factory = patches.enter_context(
+                patch('dbt.context.providers.get_adapter')
+            )
+            # Also patch the base class
+            cls.factory_cmn = patches.enter_context(
+                patch('dbt.parser.base.get_adapter')
             )
-        self.load_state_check = patch('dbt.parser.manifest.ManifestLoader.build_manifest_state_check')
-        self.mock_state_check = self.load_state_check.start()
-        self.mock_state_check.side_effect = _mock_state_check
 
-        # Create the source file patcher
-        self.load_source_file_patcher = patch.object(BaseParser, 'load_file')
-        self.mock_source_file = self.load_source_file_patcher.start()
-        self.mock_source_file.side_effect = lambda path: [n for n in self.mock_models if n.path == path][0]
+            # Create load_projects patcher
+            def _load_projects(config, paths):
+                yield config.project_name, config
+            cls.mock_load_projects = patches.enter_context(
+                patch('dbt.parser.manifest._load_projects')
+            )
+            cls.mock_load_projects.side_effect = _load_projects
+
+            # Create the Manifest.state_check patcher. The hashed values never
+            # change, so hash them once.
+            vars_hash = FileHash.from_contents('vars')
+            profile_hash = FileHash.from_contents('profile')
+            project_hashes = {}
+            def _mock_state_check(loader):
+                for name in loader.all_projects:
+                    if name not in project_hashes:
+                        project_hashes[name] = FileHash.from_contents(name)
+                return ManifestStateCheck(
+                    vars_hash=vars_hash,
+                    project_hashes={name: project_hashes[name] for name in loader.all_projects},
+                    profile_hash=profile_hash,
+                )
+            patches.enter_context(patch.object(
+                dbt.parser.manifest.ManifestLoader, 'build_manifest_state_check', _mock_state_check
+            ))
+
+            # Create the source file patcher
+            cls.mock_source_file = patches.enter_context(
+                patch.object(BaseParser, 'load_file')
+            )
+            cls.mock_source_file.side_effect = lambda path: cls.mock_models[path.search_key]
+
+            cls._patches = patches.pop_all()
+
+        # these tests never register an adapter, so the plugin only needs to
+        # be injected once
+        inject_plugin(PostgresPlugin)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._patches.close()
+        reset_adapters()
+
+    def setUp(self):
+        # create various attributes
+        dbt.flags.STRICT_MODE = True
+        type(self).graph_result = None
+        self.mock_models.clear()
+        self.mock_model_paths.clear()
 
     def get_config(self, extra_cfg=None):
         if extra_cfg is None:
             extra_cfg = {}
 
+        key = json.dumps(extra_cfg, sort_keys=True)
+        if key not in self._configs:
+            self._configs[key] = self._build_config(extra_cfg)
+        return self._configs[key]
+
+    def _build_config(self, extra_cfg):
         cfg = {
             'name': 'test_models_compile',
             'version': '0.1',
@@ -152,15 +217,17 @@ class GraphTest(unittest.TestCase):
         return dbt.compilation.Compiler(project)
 
     def use_models(self, models):
+        project_root = os.path.normcase(os.getcwd())
         for k, v in models.items():
             path = FilePath(
                 searched_path='models',
-                project_root=os.path.normcase(os.getcwd()),
+                project_root=project_root,
                 relative_path='{}.sql'.format(k),
             )
             source_file = SourceFile(path=path, checksum=FileHash.empty())
             source_file.contents = v
-            self.mock_models.append(source_file)
+            self.mock_models[path.search_key] = source_file
+            self.mock_model_paths.append(path)
 
     def load_manifest(self, config):
         loader = dbt.parser.manifest.ManifestLoader(config, {config.project_name: config})
@@ -277,37 +344,33 @@ class GraphTest(unittest.TestCase):
         self.assertEqual(manifest.nodes[node].config.materialized, 'incremental')
 
     def test__dependency_list(self):
-        self.use_models({
-            'model_1': 'select * from events',
-            'model_2': 'select * from {{ ref("model_1") }}',
-            'model_3': '''
-                select * from {{ ref("model_1") }}
-                union all
-                select * from {{ ref("model_2") }}
-            ''',
-            'model_4': 'select * from {{ ref("model_3") }}'
-        })
-
-        config = self.get_config()
-        manifest = self.load_manifest(config)
-        compiler = self.get_compiler(config)
-        graph = compiler.compile(manifest)
-
         models = ('model_1', 'model_2', 'model_3', 'model_4')
         model_ids = ['model.test_models_compile.{}'.format(m) for m in models]
 
-        manifest = MagicMock(nodes={
-            n: MagicMock(
+        # model_2 refs model_1, model_3 refs model_1 and model_2, and model_4
+        # refs model_3. Building refs into edges is covered by the tests above.
+        dependencies = networkx.DiGraph()
+        dependencies.add_nodes_from(model_ids)
+        dependencies.add_edges_from([
+            (model_ids[0], model_ids[1]),
+            (model_ids[0], model_ids[2]),
+            (model_ids[1], model_ids[2]),
+            (model_ids[2], model_ids[3]),
+        ])
+        graph = Graph(dependencies)
+
+        nodes = {
+            n: NodeStub(
                 unique_id=n,
                 name=n.split('.')[-1],
                 package_name='test_models_compile',
-                fqn=['test_models_compile', n],
-                empty=False,
-                config=MagicMock(enabled=True),
+                fqn=('test_models_compile', n),
             )
             for n in model_ids
-        })
-        manifest.expect.side_effect = lambda n: MagicMock(unique_id=n)
+        }
+        manifest = SimpleNamespace(
+            nodes=nodes, sources={}, exposures={}, expect=nodes.__getitem__
+        )
         selector = NodeSelector(graph, manifest)
         queue = selector.get_graph_queue(parse_difference(None, None))
 
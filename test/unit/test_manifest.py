@@ -13,7 +13,7 @@ import dbt.flags
 import dbt.version
 from dbt import tracking
 from dbt.contracts.files import FileHash
-from dbt.contracts.graph.manifest import Manifest, ManifestMetadata
+from dbt.contracts.graph.manifest import Manifest, ManifestMetadata, Disabled
 from dbt.contracts.graph.parsed import (
     ParsedModelNode,
     DependsOn,
@@ -1022,6 +1022,25 @@ def test_find_materialization_by_name(macros, adapter_type, expected):
         assert result.package_name == expected_package
 
 
+def test_find_materialization_by_name_cached():
+    manifest = make_manifest(macros=[
+        MockMaterialization('dep', adapter_type='foo'),
+        MockMaterialization('dbt', adapter_type=None),
+    ])
+    with mock.patch.object(
+        manifest, '_find_macros_by_name', wraps=manifest._find_macros_by_name
+    ) as find_macros:
+        for _ in range(3):
+            result = manifest.find_materialization_macro_by_name(
+                project_name='root',
+                materialization_name='my_materialization',
+                adapter_type='foo',
+            )
+            assert result.package_name == 'dep'
+        # one search for the adapter version, one for the default
+        assert find_macros.call_count == 2
+
+
 FindNodeSpec = namedtuple('FindNodeSpec', 'nodes,sources,package,expected')
 
 
@@ -1118,6 +1137,53 @@ def test_resolve_ref(nodes, sources, package, expected):
         assert result.package_name == expected_package
 
 
+def test_resolve_ref_disabled():
+    first = MockNode('dep', 'my_model')
+    second = MockNode('other', 'my_model')
+    manifest = make_manifest()
+    manifest.disabled = [MockNode('dep', 'unrelated'), first, second]
+
+    result = manifest.resolve_ref(
+        target_model_name='my_model',
+        target_model_package=None,
+        current_project='root',
+        node_package='root',
+    )
+    assert isinstance(result, Disabled)
+    assert result.target is first
+
+    result = manifest.resolve_ref(
+        target_model_name='my_model',
+        target_model_package='other',
+        current_project='root',
+        node_package='root',
+    )
+    assert isinstance(result, Disabled)
+    assert result.target is second
+
+    result = manifest.resolve_ref(
+        target_model_name='my_model',
+        target_model_package='root',
+        current_project='root',
+        node_package='root',
+    )
+    assert result is None
+
+
+def test_resolve_ref_enabled_over_disabled():
+    enabled = MockNode('dep', 'my_model', config=mock.MagicMock(enabled=True))
+    manifest = make_manifest(nodes=[enabled])
+    manifest.disabled = [MockNode('root', 'my_model')]
+
+    result = manifest.resolve_ref(
+        target_model_name='my_model',
+        target_model_package=None,
+        current_project='root',
+        node_package='dep',
+    )
+    assert result is enabled
+
+
 def _source_parameter_sets():
     sets = [
         # empties
@@ -1211,6 +1277,33 @@ def test_resolve_source(nodes, sources, package, expected):
         assert result.package_name == expected_package
 
 
+def test_resolve_source_disabled():
+    disabled = MockSource('dep', 'my_source', 'my_table')
+    manifest = make_manifest()
+    manifest.disabled = [
+        MockNode('dep', 'my_table'),
+        MockSource('dep', 'my_source', 'my_other_table'),
+        disabled,
+    ]
+
+    result = manifest.resolve_source(
+        target_source_name='my_source',
+        target_table_name='my_table',
+        current_project='root',
+        node_package='dep',
+    )
+    assert isinstance(result, Disabled)
+    assert result.target is disabled
+
+    result = manifest.resolve_source(
+        target_source_name='my_source',
+        target_table_name='my_other',
+        current_project='root',
+        node_package='dep',
+    )
+    assert result is None
+
+
 FindDocSpec = namedtuple('FindDocSpec', 'docs,package,expected')
 
 
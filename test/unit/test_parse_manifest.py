@@ -1,9 +1,13 @@
+import os
+import pickle
+import tempfile
 import unittest
 from unittest import mock
 from unittest.mock import patch
 
 from .utils import config_from_parts_or_dicts, normalize
 
+import dbt.flags
 from dbt.contracts.files import SourceFile, FileHash, FilePath
 from dbt.contracts.graph.manifest import Manifest, ManifestStateCheck
 from dbt.parser.search import FileBlock
@@ -26,58 +30,74 @@ class MismatchedHash(FileHash):
         return False
 
 
-class TestLoader(unittest.TestCase):
-    def setUp(self):
-        profile_data = {
-            'target': 'test',
-            'quoting': {},
-            'outputs': {
-                'test': {
-                    'type': 'redshift',
-                    'host': 'localhost',
-                    'schema': 'analytics',
-                    'user': 'test',
-                    'pass': 'test',
-                    'dbname': 'test',
-                    'port': 1,
-                }
+def _root_project_config(project_overrides=None, cli_vars='{}'):
+    profile_data = {
+        'target': 'test',
+        'quoting': {},
+        'outputs': {
+            'test': {
+                'type': 'redshift',
+                'host': 'localhost',
+                'schema': 'analytics',
+                'user': 'test',
+                'pass': 'test',
+                'dbname': 'test',
+                'port': 1,
             }
         }
+    }
 
-        root_project = {
-            'name': 'root',
-            'version': '0.1',
-            'profile': 'test',
-            'project-root': normalize('/usr/src/app'),
-            'config-version': 2,
-        }
+    root_project = {
+        'name': 'root',
+        'version': '0.1',
+        'profile': 'test',
+        'project-root': normalize('/usr/src/app'),
+        'config-version': 2,
+    }
+    root_project.update(project_overrides or {})
+
+    return config_from_parts_or_dicts(
+        project=root_project,
+        profile=profile_data,
+        cli_vars=cli_vars,
+    )
+
+
+def _mock_state_check(loader):
+    return ManifestStateCheck(
+        vars_hash=FileHash.from_contents('vars'),
+        project_hashes={
+            name: FileHash.from_contents(name)
+            for name in loader.all_projects
+        },
+        profile_hash=FileHash.from_contents('profile'),
+    )
+
+
+def _patch_state_check():
+    return patch.object(
+        manifest.ManifestLoader, 'build_manifest_state_check', _mock_state_check
+    )
 
-        self.root_project_config = config_from_parts_or_dicts(
-            project=root_project,
-            profile=profile_data,
+
+class TestLoader(unittest.TestCase):
+    def setUp(self):
+        self.root_project_config = _root_project_config(
             cli_vars='{"test_schema_name": "foo"}'
         )
         self.parser = mock.MagicMock()
 
-        # Create the Manifest.state_check patcher
-        @patch('dbt.parser.manifest.ManifestLoader.build_manifest_state_check')
-        def _mock_state_check(self):
-            config = self.root_project
-            all_projects = self.all_projects
-            return ManifestStateCheck(
-                vars_hash=FileHash.from_contents('vars'),
-                project_hashes={name: FileHash.from_contents(name) for name in all_projects},
-                profile_hash=FileHash.from_contents('profile'),
-            )
-        self.load_state_check = patch('dbt.parser.manifest.ManifestLoader.build_manifest_state_check')
-        self.mock_state_check = self.load_state_check.start()
-        self.mock_state_check.side_effect = _mock_state_check
+        self.load_state_check = _patch_state_check()
+        self.load_state_check.start()
 
         self.loader = manifest.ManifestLoader(
             self.root_project_config,
             {'root': self.root_project_config}
         )
 
+    def tearDown(self):
+        self.load_state_check.stop()
+
     def _new_manifest(self):
         state_check = ManifestStateCheck(MatchingHash(), MatchingHash, [])
         manifest = Manifest({}, {}, {}, {}, {}, {}, [], {})
@@ -161,3 +181,98 @@ class TestLoader(unittest.TestCase):
         # the filename wasn't in the cache, so parse_file should get called
         # with a  FileBlock that has the given source file in it.
         self.parser.parse_file.assert_called_once_with(FileBlock(file=source_file))
+
+    def test_load_files_parallel(self):
+        source_files = [
+            self._matching_file('models', 'model_{}.sql'.format(idx))
+            for idx in range(manifest.PARALLEL_LOAD_THRESHOLD)
+        ]
+        by_key = {f.path.search_key: f for f in source_files}
+        self.parser.load_file.side_effect = lambda path: by_key[path.search_key]
+
+        paths = [f.path for f in source_files]
+        # the same path found twice should only be loaded once
+        self.loader._load_files([(self.parser, paths), (self.parser, paths[:1])])
+        self.assertEqual(self.parser.load_file.call_count, len(source_files))
+        self.assertEqual(set(self.loader._loaded_file_cache), set(by_key))
+        for key, block in self.loader._loaded_file_cache.items():
+            self.assertIs(block.file, by_key[key])
+
+
+class TestPartialParseFile(unittest.TestCase):
+    def setUp(self):
+        self.target_dir = tempfile.TemporaryDirectory()
+        self.root_project_config = _root_project_config(
+            {'target-path': self.target_dir.name}
+        )
+
+        self.load_state_check = _patch_state_check()
+        self.load_state_check.start()
+
+        self.partial_parse = patch.object(dbt.flags, 'PARTIAL_PARSE', True)
+        self.partial_parse.start()
+
+    def tearDown(self):
+        self.partial_parse.stop()
+        self.load_state_check.stop()
+        self.target_dir.cleanup()
+
+    def _new_loader(self):
+        return manifest.ManifestLoader(
+            self.root_project_config,
+            {'root': self.root_project_config}
+        )
+
+    def test_round_trip(self):
+        loader = self._new_loader()
+        self.assertIsNone(loader.old_manifest)
+        loader.write_manifest_for_partial_parse()
+
+        new_loader = self._new_loader()
+        self.assertIsNotNone(new_loader.old_manifest)
+        self.assertEqual(
+            new_loader.old_manifest.state_check,
+            loader.manifest.state_check
+        )
+
+    def test_state_mismatch_skips_manifest(self):
+        loader = self._new_loader()
+        loader.manifest.state_check.vars_hash = FileHash.from_contents('other')
+        loader.write_manifest_for_partial_parse()
+
+        with patch('dbt.parser.manifest.pickle.load', wraps=pickle.load) as load:
+            new_loader = self._new_loader()
+        self.assertIsNone(new_loader.old_manifest)
+        # only the header should have been read
+        self.assertEqual(load.call_count, 1)
+
+    def test_unchanged_not_rewritten(self):
+        self._new_loader().write_manifest_for_partial_parse()
+
+        loader = self._new_loader()
+        self.assertIsNotNone(loader.old_manifest)
+        with patch('dbt.parser.manifest.pickle.dump') as dump:
+            loader.write_manifest_for_partial_parse()
+        dump.assert_not_called()
+
+    def test_changed_rewritten(self):
+        self._new_loader().write_manifest_for_partial_parse()
+
+        loader = self._new_loader()
+        source_file = SourceFile.empty(FilePath(
+            searched_path='models',
+            relative_path='model_1.sql',
+            project_root=normalize('/usr/src/app'),
+        ))
+        loader.manifest.files[source_file.path.search_key] = source_file
+        with patch('dbt.parser.manifest.pickle.dump') as dump:
+            loader.write_manifest_for_partial_parse()
+        self.assertEqual(dump.call_count, 2)
+
+    def test_old_format(self):
+        loader = self._new_loader()
+        path = os.path.join(self.target_dir.name, manifest.PARTIAL_PARSE_FILE_NAME)
+        with open(path, 'wb') as fp:
+            pickle.dump(loader.manifest, fp)
+
+        self.assertIsNone(self._new_loader().old_manifest)
@@ -871,6 +871,11 @@ class ProcessingTest(BaseParserTest):
         process_sources(self.manifest, 'project')
         self.x_node.depends_on.nodes.append.assert_called_once_with('source.thirdproject.src.tbl')
 
+    def test_process_sources_duplicated(self):
+        self.x_node.sources = [['src', 'tbl'], ['src', 'tbl']]
+        process_sources(self.manifest, 'project')
+        self.x_node.depends_on.nodes.append.assert_called_once_with('source.thirdproject.src.tbl')
+
     def test_process_refs(self):
         process_refs(self.manifest, 'project')
         self.y_node.depends_on.nodes.append.assert_called_once_with('model.project.x')
@@ -2,6 +2,7 @@ import os
 import shutil
 import stat
 import unittest
+from unittest import mock
 from tempfile import mkdtemp, NamedTemporaryFile
 
 from dbt.exceptions import ExecutableError, WorkingDirectoryError
@@ -178,6 +179,32 @@ class TestFindMatching(unittest.TestCase):
             out = dbt.clients.system.find_matching(self.tempdir, [''], '*.sql')
             self.assertEqual(out, [])
 
+    def test_find_matching_cached_walks(self):
+        relative_path = os.path.basename(self.tempdir)
+        with NamedTemporaryFile(prefix='sql-files', suffix='.sql', dir=self.tempdir) as sql_file, \
+                NamedTemporaryFile(prefix='yml-files', suffix='.yml', dir=self.tempdir) as yml_file:
+            with mock.patch('os.walk', wraps=os.walk) as walk:
+                with dbt.clients.system.cached_directory_walks():
+                    sql_out = dbt.clients.system.find_matching(
+                        self.base_dir, [relative_path], '*.sql'
+                    )
+                    yml_out = dbt.clients.system.find_matching(
+                        self.base_dir, [relative_path], '*.yml'
+                    )
+                self.assertEqual(walk.call_count, 1)
+                # outside the context manager, every search walks again
+                dbt.clients.system.find_matching(
+                    self.base_dir, [relative_path], '*.sql'
+                )
+                self.assertEqual(walk.call_count, 2)
+
+            self.assertEqual(
+                [o['absolute_path'] for o in sql_out], [sql_file.name]
+            )
+            self.assertEqual(
+                [o['absolute_path'] for o in yml_out], [yml_file.name]
+            )
+
     def tearDown(self):
         try:
             shutil.rmtree(self.base_dir)